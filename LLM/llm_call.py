@@ -16,13 +16,13 @@ from .scaling_up_demo_tool import scaling_up_search
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-# For debugging - set to True to print debug info (tool-call events only)
-DEBUG = True
+# For debugging - set LLM_DEBUG=true to print debug info (tool-call events only)
+DEBUG = os.getenv("LLM_DEBUG", "false").lower() == "true"
 
-def debug_print(*args, **kwargs):
-    """Print debug information if DEBUG is True"""
+def debug_print(msg: str, *args):
+    """Print debug information if DEBUG is True; args are %-formatted only when printed"""
     if DEBUG:
-        print("[DEBUG]", *args, file=sys.stderr, **kwargs)
+        print("[DEBUG]", msg % args if args else msg, file=sys.stderr)
 
 # Define function schema for GPT-4.1
 tools = [
@@ -61,6 +61,25 @@ SYSTEM_PROMPT = (
 )
 
 MAX_TOOL_CALLS = 4
+MAX_HISTORY_TURNS = 8
+
+def build_messages(history: list, query: str) -> list:
+    """
+    Build the model input: system prompt, the last MAX_HISTORY_TURNS
+    user-assistant exchanges, then the current user query.
+    """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        *(
+            message
+            for turn in history[-MAX_HISTORY_TURNS:]
+            for message in (
+                {"role": "user", "content": turn["user"]},
+                {"role": "assistant", "content": turn["assistant"]},
+            )
+        ),
+        {"role": "user", "content": query},
+    ]
 
 def ask_scaling_up(history: list, query: str) -> str:
     """
@@ -69,13 +88,7 @@ def ask_scaling_up(history: list, query: str) -> str:
     Allows up to MAX_TOOL_CALLS sequential invocations before finalizing.
     """
     # Initialize message history
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-    # Include last 8 user-assistant exchanges
-    for turn in history[-8:]:
-        messages.append({"role": "user", "content": turn["user"]})
-        messages.append({"role": "assistant", "content": turn["assistant"]})
-    # Add current user query
-    messages.append({"role": "user", "content": query})
+    messages = build_messages(history, query)
 
     tool_calls = 0
     final_response = None
@@ -134,28 +147,25 @@ async def ask_scaling_up_stream(history: list, query: str) -> AsyncGenerator[str
     """
     Streaming version of ask_scaling_up.
     Returns an async generator that yields content deltas as they're received.
-    Tool calls are still processed synchronously before streaming the final response.
+    Tool calls are resolved before streaming the final response, without
+    blocking the event loop: model calls use the async client and the
+    search tool runs in a worker thread.
     """
     
     # Initialize message history
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-    # Include last 8 user-assistant exchanges
-    for turn in history[-8:]:
-        messages.append({"role": "user", "content": turn["user"]})
-        messages.append({"role": "assistant", "content": turn["assistant"]})
-    # Add current user query
-    messages.append({"role": "user", "content": query})
+    messages = build_messages(history, query)
 
     tool_calls = 0
     final_messages = messages.copy()
     
-    debug_print(f"Processing tool calls for query: {query}")
+    debug_print("Processing tool calls for query: %s", query)
 
     while tool_calls < MAX_TOOL_CALLS:
-        debug_print(f"Checking for tool call {tool_calls+1}/{MAX_TOOL_CALLS}")
+        debug_print("Checking for tool call %d/%d", tool_calls + 1, MAX_TOOL_CALLS)
         
-        # Send to GPT-4.1 with function schema
-        resp = client.responses.create(
+        # Send to GPT-4.1 with function schema (async client, so the
+        # event loop is not blocked while waiting for the model)
+        resp = await async_client.responses.create(
             model="gpt-4.1",
             input=messages,
             tools=tools
@@ -169,10 +179,12 @@ async def ask_scaling_up_stream(history: list, query: str) -> AsyncGenerator[str
             break
 
         # Execute the function
-        debug_print(f"Executing function call: {func_call.name}")
+        debug_print("Executing function call: %s", func_call.name)
         args = json.loads(func_call.arguments)
-        result = scaling_up_search(args.get("query"))
-        debug_print(f"Function returned result length: {len(result)}")
+        # The search does blocking embedding, Pinecone and rerank calls;
+        # run it in a worker thread so the event loop keeps serving
+        result = await asyncio.to_thread(scaling_up_search, args.get("query"))
+        debug_print("Function returned result length: %d", len(result))
 
         # Append the function call and its output
         function_call_msg = {
@@ -194,12 +206,12 @@ async def ask_scaling_up_stream(history: list, query: str) -> AsyncGenerator[str
 
         tool_calls += 1
         if tool_calls >= MAX_TOOL_CALLS:
-            debug_print(f"Reached max tool calls: {MAX_TOOL_CALLS}")
+            debug_print("Reached max tool calls: %d", MAX_TOOL_CALLS)
             break
 
     # For direct single response (fallback)
     if DEBUG and not tool_calls:
-        debug_print(f"No tool calls made for query: {query}")
+        debug_print("No tool calls made for query: %s", query)
 
     # Stream the final response
     
@@ -238,7 +250,7 @@ async def ask_scaling_up_stream(history: list, query: str) -> AsyncGenerator[str
         # If no content was streamed, yield a fallback message
         if not got_content:
             # Get a non-streaming response as fallback
-            fallback_resp = client.responses.create(
+            fallback_resp = await async_client.responses.create(
                 model="gpt-4.1-mini-2025-04-14",
                 input=final_messages,
                 tools=tools
@@ -246,7 +258,7 @@ async def ask_scaling_up_stream(history: list, query: str) -> AsyncGenerator[str
             yield fallback_resp.output_text or "I'm sorry, I couldn't generate a response. Please try again."
     except Exception:
         # Fallback on stream error
-        fallback_resp = client.responses.create(
+        fallback_resp = await async_client.responses.create(
             model="gpt-4.1-mini-2025-04-14",
             input=final_messages,
             tools=tools
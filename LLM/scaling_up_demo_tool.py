@@ -5,6 +5,7 @@ IASPIS Search Module - Retrieves relevant chunks from Pinecone using semantic se
 
 import os
 import json
+from functools import lru_cache
 from typing import List, Dict, Any
 from openai import OpenAI
 from pinecone import Pinecone
@@ -15,14 +16,32 @@ NAMESPACE = "scaling-up-demo"
 EMBEDDING_MODEL = "text-embedding-3-small"
 TOP_K = 9  # Number of chunks to retrieve
 TOP_RERANKED = 4  # Number of chunks to keep after reranking
+EMBEDDING_CACHE_SIZE = 1024  # Number of query embeddings kept in memory
 
 # Initialize clients
 client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 pc = Pinecone(api_key=os.environ.get("PINECONE_API_KEY"))
 
+# Pinecone index handle, created on first search and reused afterwards
+_index = None
+
+def get_index():
+    """
+    Return the Pinecone index handle, creating it only once per process.
+    Each pc.Index() call builds a new client with its own connection pool,
+    so a fresh handle per search costs a new TLS handshake per query.
+    """
+    global _index
+    if _index is None:
+        _index = pc.Index(INDEX_NAME)
+    return _index
+
+@lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
 def get_embedding(text: str) -> List[float]:
     """
     Generate an embedding for the given text using OpenAI's text-embedding-3-small model.
+    Results are cached per text, so repeated tool calls with the same query
+    skip the embeddings API. Callers must not mutate the returned list.
     
     Args:
         text: The input text to embed
@@ -51,8 +70,8 @@ def scaling_up_search(query: str) -> str:
         # Get embedding for the query
         query_embedding = get_embedding(query)
         
-        # Connect directly to the existing index
-        index = pc.Index(INDEX_NAME)
+        # Reuse the cached handle to the existing index
+        index = get_index()
         
         # Query the index
         query_response = index.query(
@@ -28,8 +28,8 @@ def csv_to_md(file_bytes: bytes, delimiter: str = ",") -> str:
 
         with open(tmp_file.name, newline="") as csvfile:
             reader = csv.reader(csvfile, delimiter=delimiter)
-            for row in reader:
-                markdown_content += "| " + " | ".join(row) + " |\n"
+            markdown_content = "".join(
+                "| " + " | ".join(row) + " |\n" for row in reader)
         return markdown_content
     except Exception as e:
         print(f"Error with csv extraction: {e}")
@@ -4,6 +4,7 @@ from bson import ObjectId
 from pymongo import MongoClient
 from gridfs import GridFS
 import hashlib
+from typing import BinaryIO, Union
 
 
 def initialize_db(db_url: str = "mongodb://localhost:27017/"):
@@ -115,14 +116,17 @@ class Chunks(Document):
         return f"Chunks(document={self.document}, user={self.user}, namespace={self.namespace}, chunk_index={self.chunk_index}, vector_id={self.vector_id}, created_at={self.created_at})"
 
 
-def upload_file_to_gridfs(fs: GridFS, file_content: bytes, filename: str, content_type: str = "text/plain") -> ObjectId:
-    """Upload a file to GridFS and return the file ObjectId"""
+def upload_file_to_gridfs(fs: GridFS, file_content: Union[bytes, BinaryIO], filename: str, content_type: str = "text/plain") -> ObjectId:
+    """Upload a file to GridFS and return the file ObjectId
+
+    file_content can be bytes or an open binary file; files are read by
+    GridFS chunk by chunk, and the stored length is set by GridFS itself
+    """
     try:
         file_id = fs.put(
             file_content,
             filename=filename,
             contentType=content_type,  # default is text/plain
-            length=len(file_content),
             uploadDate=datetime.now()
         )
         return file_id
@@ -182,29 +186,37 @@ def create_sample_data(client, db, fs):
 
             # Create sample chunks
             sentences = file_content.split('. ')
+            chunks = []
+            # One timestamp for the whole bulk insert
+            chunks_created_at = datetime.now()
             for i, sentence in enumerate(sentences):
-                if sentence.strip():
-                    chunk = Chunks(
+                # Strip once; the stripped text is both the check and the content
+                sentence = sentence.strip()
+                if sentence:
+                    chunks.append(Chunks(
                         document=document,  # Reference to the document object
                         user=user,  # Reference to the user object
                         namespace="test_namespace",
                         chunk_index=i,
-                        content=sentence.strip(),
-                        summary=sentence.strip()[
+                        content=sentence,
+                        summary=sentence[
                             # Simple summary
-                            :100] + "..." if len(sentence.strip()) > 100 else sentence.strip(),
+                            :100] + "..." if len(sentence) > 100 else sentence,
                         vector_id=None,  # Initially null, will be populated after embedding
-                        created_at=datetime.now()
-                    )
-                    chunk.save()
-                    print(f"Created chunk {i}: {chunk}")
+                        created_at=chunks_created_at
+                    ))
+
+            # Single bulk insert instead of one round trip per chunk
+            if chunks:
+                Chunks.objects.insert(chunks, load_bulk=False)
+            print(f"Created {len(chunks)} chunks")
 
             print(
                 f"\n=== Sample Data Created Successfully for {file_path} ===")
             print(f"User ID: {user.id}")
             print(f"Document ID: {document.id}")
             print(f"GridFS File ID: {gridfs_file_id}")
-            print(f"Number of chunks created: {len(sentences)}")
+            print(f"Number of chunks created: {len(chunks)}")
 
         return user.id, document.id, gridfs_file_id
 
@@ -9,13 +9,34 @@ import hashlib
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, BinaryIO, Set
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
 
 from db_service import initialize_db, User_Auth_Table, Documents, upload_file_to_gridfs
 from file_type import doc_type_check
 
+# doc_type_check only inspects the start of a file
+FILE_TYPE_SAMPLE_SIZE = 2048
+# Block size used when hashing files from disk
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# doc_type_check description -> GridFS content type
+CONTENT_TYPE_MAP = {
+    "The document provided is a PDF file": "application/pdf",
+    "The document provided is a DOCX file": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "The document provided is a TXT file": "text/plain",
+    "The document provided is a CSV file": "text/csv"
+}
+
+# doc_type_check description -> simple type stored on Documents
+FILE_TYPE_SIMPLE_MAP = {
+    "The document provided is a PDF file": "pdf",
+    "The document provided is a DOCX file": "docx",
+    "The document provided is a TXT file": "txt",
+    "The document provided is a CSV file": "csv"
+}
+
 
 class DocumentPipeline:
     """Main document processing pipeline with parallel processing support"""
@@ -45,9 +66,15 @@ class DocumentPipeline:
         }
         self._stats_lock = Lock()
 
+        # Hashes this user already uploaded, prefetched per directory run
+        # so duplicate checks don't cost a query per file
+        self._known_hashes: Optional[Set[str]] = None
+
         # Get the existing test user
         try:
-            self.user = User_Auth_Table.objects(user_name="test_user").first()
+            # Only the id (for references) and name (for logging) are used
+            self.user = User_Auth_Table.objects(
+                user_name="test_user").only('user_name').first()
             if not self.user:
                 raise Exception("Test user not found in database")
             print(f"Using user: {self.user.user_name} (ID: {self.user.id})")
@@ -56,18 +83,32 @@ class DocumentPipeline:
         except Exception as e:
             raise Exception(f"Error getting user: {e}")
 
-    def generate_file_hash(self, file_bytes: bytes) -> str:
-        """Generate SHA256 hash for the file content"""
-        return hashlib.sha256(file_bytes).hexdigest()
+    def generate_file_hash_from_path(self, file_path: str) -> str:
+        """Generate SHA256 hash for a file on disk, reading it in blocks"""
+        hasher = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def _load_known_hashes(self):
+        """Fetch the hashes of all of this user's documents in a single query"""
+        with self._db_lock:
+            self._known_hashes = set(
+                Documents.objects(user=self.user.pk).scalar('full_hash'))
 
     def check_file_exists(self, file_hash: str) -> bool:
         """Check if a file with this hash already exists for this user (thread-safe)"""
         try:
             with self._db_lock:
+                if self._known_hashes is not None:
+                    return file_hash in self._known_hashes
                 # Add small delay for rate limiting
                 time.sleep(self.rate_limit_delay / 2)
+                # Query by the user's pk and only project the id, so no
+                # reference is dereferenced and no document is hydrated
                 existing_doc = Documents.objects(
-                    user=self.user, full_hash=file_hash).first()
+                    user=self.user.pk, full_hash=file_hash).only('id').first()
                 return existing_doc is not None
         except Exception as e:
             print(f"Error checking file existence: {e}")
@@ -101,11 +142,11 @@ class DocumentPipeline:
             if result_type in self._stats:
                 self._stats[result_type] += 1
 
-    def _safe_gridfs_upload(self, file_bytes: bytes, filename: str, content_type: str):
-        """Thread-safe GridFS upload with rate limiting"""
+    def _safe_gridfs_upload(self, file_obj: BinaryIO, filename: str, content_type: str):
+        """Thread-safe GridFS upload with rate limiting, streamed from an open file"""
         with self._db_lock:
             time.sleep(self.rate_limit_delay)
-            return upload_file_to_gridfs(self.fs, file_bytes, filename, content_type)
+            return upload_file_to_gridfs(self.fs, file_obj, filename, content_type)
 
     def _safe_document_save(self, document: Documents):
         """Thread-safe document save with rate limiting"""
@@ -128,14 +169,14 @@ class DocumentPipeline:
         }
 
         try:
-            # Read file bytes
+            # Only read the header; the file itself is streamed below
             with open(file_path, 'rb') as f:
-                file_bytes = f.read()
+                file_header = f.read(FILE_TYPE_SAMPLE_SIZE)
 
-            # Get file type and size using existing function
-            file_type_info = doc_type_check(file_bytes)
+            # Get file type using existing function, size from the filesystem
+            file_type_info = doc_type_check(file_header)
             file_type_description = file_type_info[0]
-            file_size = file_type_info[1]
+            file_size = os.path.getsize(file_path)
 
             result['file_type'] = file_type_description
             result['file_size'] = file_size
@@ -146,7 +187,7 @@ class DocumentPipeline:
                 f"  Size: {file_size:,} bytes ({file_size / 1024 / 1024:.2f} MB)")
 
             # Generate hash
-            file_hash = self.generate_file_hash(file_bytes)
+            file_hash = self.generate_file_hash_from_path(file_path)
             result['hash'] = file_hash
             print(f"  Hash: {file_hash[:16]}...")
 
@@ -158,21 +199,16 @@ class DocumentPipeline:
                 return result
 
             # Determine content type for GridFS
-            content_type_map = {
-                "The document provided is a PDF file": "application/pdf",
-                "The document provided is a DOCX file": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                "The document provided is a TXT file": "text/plain",
-                "The document provided is a CSV file": "text/csv"
-            }
-            content_type = content_type_map.get(
+            content_type = CONTENT_TYPE_MAP.get(
                 file_type_description, "application/octet-stream")
 
-            # Upload to GridFS (thread-safe)
-            gridfs_file_id = self._safe_gridfs_upload(
-                file_bytes,
-                os.path.basename(file_path),
-                content_type
-            )
+            # Upload to GridFS (thread-safe), streaming from disk
+            with open(file_path, 'rb') as f:
+                gridfs_file_id = self._safe_gridfs_upload(
+                    f,
+                    os.path.basename(file_path),
+                    content_type
+                )
 
             if not gridfs_file_id:
                 result['message'] = "Failed to upload to GridFS"
@@ -184,13 +220,7 @@ class DocumentPipeline:
             print(f"  GridFS ID: {gridfs_file_id}")
 
             # Map file type description to simple type
-            file_type_simple_map = {
-                "The document provided is a PDF file": "pdf",
-                "The document provided is a DOCX file": "docx",
-                "The document provided is a TXT file": "txt",
-                "The document provided is a CSV file": "csv"
-            }
-            file_type_simple = file_type_simple_map.get(
+            file_type_simple = FILE_TYPE_SIMPLE_MAP.get(
                 file_type_description, "unknown")
 
             # Create Documents record (thread-safe)
@@ -206,6 +236,9 @@ class DocumentPipeline:
             )
 
             result['document_id'] = self._safe_document_save(document)
+            if self._known_hashes is not None:
+                with self._db_lock:
+                    self._known_hashes.add(file_hash)
             print(f"  Document ID: {result['document_id']}")
             print(f"  Status: SUCCESS - Uploaded to GridFS and created document record")
 
@@ -249,10 +282,20 @@ class DocumentPipeline:
                 'processing_time': 0
             }
 
-        if use_parallel and len(files) > 1:
-            results = self._process_files_parallel(files, namespace)
-        else:
-            results = self._process_files_sequential(files, namespace)
+        # One query for existing hashes instead of one per file
+        try:
+            self._load_known_hashes()
+        except Exception as e:
+            print(f"Error prefetching existing hashes, checking per file: {e}")
+            self._known_hashes = None
+
+        try:
+            if use_parallel and len(files) > 1:
+                results = self._process_files_parallel(files, namespace)
+            else:
+                results = self._process_files_sequential(files, namespace)
+        finally:
+            self._known_hashes = None
 
         # Calculate final statistics
         with self._stats_lock:
@@ -27,8 +27,8 @@ def docx_to_md(file_bytes: bytes) -> str:
         tmp_file.flush()
     try:
         doc = Document(tmp_file.name)
-        for paragraph in doc.paragraphs:
-            markdown_content += paragraph.text + "\n"
+        markdown_content = "".join(
+            paragraph.text + "\n" for paragraph in doc.paragraphs)
         return markdown_content
     except ImportError:
         print(
@@ -22,8 +22,10 @@ def inspect_database():
 
     # Check users
     try:
-        users = User_Auth_Table.objects()
-        print(f"Number of users: {len(users)}")
+        # Stream users from the cursor instead of caching them all
+        users = User_Auth_Table.objects().only(
+            'user_name', 'email').no_cache().batch_size(100)
+        print(f"Number of users: {users.count()}")
         for user in users:
             print(
                 f"  User: {user.user_name}, ID: {user.id}, Email: {user.email}")
@@ -33,14 +35,16 @@ def inspect_database():
 
     # Check documents
     try:
-        docs = Documents.objects()
-        print(f"Number of documents: {len(docs)}")
+        # Only fetch the fields we print, as raw dicts (no ORM objects)
+        docs = Documents.objects().only(
+            'file_name', 'gridfs_file_id', 'full_hash', 'status', 'namespace').as_pymongo().no_cache().batch_size(100)
+        print(f"Number of documents: {docs.count()}")
         for doc in docs:
-            print(f"  Doc: {doc.file_name}")
-            print(f"    GridFS ID: {doc.gridfs_file_id}")
-            print(f"    Hash: {doc.full_hash[:16]}...")
-            print(f"    Status: {doc.status}")
-            print(f"    Namespace: {doc.namespace}")
+            print(f"  Doc: {doc['file_name']}")
+            print(f"    GridFS ID: {doc['gridfs_file_id']}")
+            print(f"    Hash: {doc['full_hash'][:16]}...")
+            print(f"    Status: {doc['status']}")
+            print(f"    Namespace: {doc['namespace']}")
         print()
     except Exception as e:
         print(f"Error reading documents: {e}\n")
@@ -59,10 +63,11 @@ def inspect_database():
 
     # Check chunks
     try:
-        chunks = Chunks.objects()
-        print(f"Number of chunks: {len(chunks)}")
-        if len(chunks) > 0:
-            sample_chunk = chunks[0]
+        # Count on the server and fetch a single sample instead of
+        # materializing every chunk just to test for emptiness
+        print(f"Number of chunks: {Chunks.objects().count()}")
+        sample_chunk = Chunks.objects().first()
+        if sample_chunk:
             print(f"  Sample chunk: {sample_chunk.content[:50]}...")
             print(f"    Document: {sample_chunk.document.file_name}")
             print(f"    User: {sample_chunk.user.user_name}")
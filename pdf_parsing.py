@@ -113,9 +113,7 @@ def pdf_to_md(file_bytes: bytes) -> str:
     try:
         from pypdf import PdfReader
         reader = PdfReader(tmp_file.name)
-        full_text = ""
-        for page in reader.pages:
-            full_text += page.extract_text()
+        full_text = "".join(page.extract_text() for page in reader.pages)
         return full_text
     except ImportError:
         print(
@@ -2,6 +2,7 @@
 PDF utility functions for compliance agents
 """
 import os
+import re
 import pathlib
 import tempfile
 from typing import Optional, Tuple
@@ -12,6 +13,27 @@ from llama_cloud_services import LlamaParse
 # Load environment variables to access API keys
 load_dotenv()
 
+# Markdown-stripping substitutions, compiled once and applied in order
+# by convert_markdown_to_plain_text (order matters, e.g. bold before italic)
+_MARKDOWN_SUBSTITUTIONS = [
+    (re.compile(r'^#+\s+', re.MULTILINE), ''),                # headers
+    (re.compile(r'\*\*([^\*]+)\*\*'), r'\1'),                 # bold **text**
+    (re.compile(r'__([^_]+)__'), r'\1'),                     # bold __text__
+    (re.compile(r'\*([^\*]+)\*'), r'\1'),                     # italic *text*
+    (re.compile(r'_([^_]+)_'), r'\1'),                       # italic _text_
+    (re.compile(r'\[([^\]]+)\]\([^\)]+\)'), r'\1'),            # links [text](url)
+    (re.compile(r'!\[([^\]]*)\]\([^\)]+\)'), r'\1'),           # images ![alt](url)
+    (re.compile(r'```[^`]*```', re.DOTALL), ''),             # code blocks
+    (re.compile(r'`([^`]+)`'), r'\1'),                       # inline code
+    (re.compile(r'^---+$', re.MULTILINE), ''),               # horizontal rules
+    (re.compile(r'^>\s+', re.MULTILINE), ''),                # blockquotes
+    (re.compile(r'^[\*\-\+]\s+', re.MULTILINE), ''),          # bullet list markers
+    (re.compile(r'^\d+\.\s+', re.MULTILINE), ''),             # numbered list markers
+    (re.compile(r'\|'), ' '),                                # table formatting (basic)
+    (re.compile(r'\n{3,}'), '\n\n'),                         # extra blank lines
+    (re.compile(r'[ \t]+'), ' '),                            # repeated spaces/tabs
+]
+
 def extract_page_from_pdf(pdf_path: str, page_number: int) -> Tuple[str, str]:
     """
     Extract a specific page from a PDF file, save it as a separate PDF,
@@ -327,47 +349,9 @@ def convert_markdown_to_plain_text(markdown_text: str) -> str:
     Returns:
         str: Plain text with markdown syntax removed
     """
-    import re
-    
-    # Remove markdown headers (# ## ### etc.)
-    text = re.sub(r'^#+\s+', '', markdown_text, flags=re.MULTILINE)
-    
-    # Remove bold (**text** or __text__)
-    text = re.sub(r'\*\*([^\*]+)\*\*', r'\1', text)
-    text = re.sub(r'__([^_]+)__', r'\1', text)
-    
-    # Remove italic (*text* or _text_)
-    text = re.sub(r'\*([^\*]+)\*', r'\1', text)
-    text = re.sub(r'_([^_]+)_', r'\1', text)
-    
-    # Remove links [text](url)
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-    
-    # Remove images ![alt](url)
-    text = re.sub(r'!\[([^\]]*)\]\([^\)]+\)', r'\1', text)
-    
-    # Remove code blocks ```code```
-    text = re.sub(r'```[^`]*```', '', text, flags=re.DOTALL)
-    
-    # Remove inline code `code`
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    
-    # Remove horizontal rules
-    text = re.sub(r'^---+$', '', text, flags=re.MULTILINE)
-    
-    # Remove blockquotes
-    text = re.sub(r'^>\s+', '', text, flags=re.MULTILINE)
-    
-    # Remove list markers (- * + or numbers)
-    text = re.sub(r'^[\*\-\+]\s+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^\d+\.\s+', '', text, flags=re.MULTILINE)
-    
-    # Remove table formatting (basic)
-    text = re.sub(r'\|', ' ', text)
-    
-    # Clean up extra whitespace
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r'[ \t]+', ' ', text)
+    text = markdown_text
+    for pattern, replacement in _MARKDOWN_SUBSTITUTIONS:
+        text = pattern.sub(replacement, text)
     text = text.strip()
     
     return text
@@ -1,4 +1,5 @@
 import os
+import time
 import asyncio
 import logging
 import tiktoken
@@ -7,6 +8,7 @@ from dotenv import load_dotenv
 from openai import AsyncOpenAI
 from openai import OpenAIError
 from pinecone import Pinecone, ServerlessSpec
+from pinecone.exceptions import PineconeException
 from aiolimiter import AsyncLimiter
 import backoff
 
@@ -33,6 +35,8 @@ EMBEDDING_MODEL      = "text-embedding-3-small"
 EMBEDDING_DIMENSION  = 1536
 SUMMARY_MODEL        = "gpt-4.1-mini"
 ENCODING_NAME        = "cl100k_base"  # For tiktoken
+# Use the gRPC data plane for upserts (requires `pip install "pinecone[grpc]"`)
+PINECONE_USE_GRPC    = os.getenv("PINECONE_USE_GRPC", "false").lower() == "true"
 
 # Rate limits
 SUMMARY_RPM = 2000    # requests per minute for gpt-4.1-mini
@@ -41,10 +45,13 @@ EMBED_RPM   = 600     # safe default for embeddings
 # Tiktoken Encoding
 ENCODING = tiktoken.get_encoding(ENCODING_NAME)
 
-# Concurrency & batch sizes
 # Concurrency & batch sizes
 FILE_CONCURRENCY = 20
-CHUNK_BATCH_SIZE = 5
+# Chunks per micro-batch: one embeddings request, CHUNK_BATCH_SIZE concurrent
+# summaries, and the unit dropped when embedding fails. Inputs are at most
+# ~7160 tokens (7000-token chunk + 150-token summary + prefix), so the 300k
+# tokens-per-request cap would allow 41; 32 is a conservative value with headroom
+CHUNK_BATCH_SIZE = 32
 # Dynamically derive semaphores from rate limits (reqs/sec)
 MAX_CONCURRENT_SUMMARIES = max(1, SUMMARY_RPM // 60)
 MAX_CONCURRENT_EMBEDS = max(1, EMBED_RPM // 60)
@@ -53,7 +60,12 @@ MAX_CONCURRENT_EMBEDS = max(1, EMBED_RPM // 60)
 summary_concurrency_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SUMMARIES)
 embed_concurrency_semaphore = asyncio.Semaphore(MAX_CONCURRENT_EMBEDS)
 client = AsyncOpenAI(api_key=OPENAI_API_KEY)
-pc     = Pinecone(api_key=PINECONE_API_KEY)
+if PINECONE_USE_GRPC:
+    # gRPC multiplexes the concurrent batch upserts over one connection
+    from pinecone.grpc import PineconeGRPC
+    pc = PineconeGRPC(api_key=PINECONE_API_KEY)
+else:
+    pc = Pinecone(api_key=PINECONE_API_KEY)
 
 # Pinecone index setup (sync, at startup)
 # list_indexes returns list of index names (strings)
@@ -147,11 +159,31 @@ async def get_batched_embeddings_with_retry_async(texts_for_embedding: list[str]
         )
         return [data.embedding for data in response.data]
 
+def giveup_pinecone_retry(e: Exception) -> bool:
+    """True when an upsert error should not be retried by backoff."""
+    if PINECONE_USE_GRPC:
+        # The gRPC client retries transient failures with its own policy and
+        # its errors carry no HTTP status, so don't stack a second loop on it
+        return True
+    # 4xx errors other than 429 will fail the same way on retry
+    status = getattr(e, "status", None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+@backoff.on_exception(backoff.expo,
+                      PineconeException,
+                      max_tries=5,
+                      max_time=120,
+                      giveup=giveup_pinecone_retry,
+                      jitter=backoff.full_jitter)
+def upsert_batch_with_retry(index, batch):
+    """Upserts a single batch of vectors to Pinecone with retry logic."""
+    index.upsert(vectors=batch, namespace=NAMESPACE)
+
 def upsert_vectors_to_pinecone(index, vectors_to_upsert):
     """Upserts a list of vectors to Pinecone in batches."""
     for i in range(0, len(vectors_to_upsert), 100):
         batch = vectors_to_upsert[i:i+100]
-        index.upsert(vectors=batch, namespace=NAMESPACE)
+        upsert_batch_with_retry(index, batch)
 
 async def upsert_vectors_to_pinecone_async(index, vectors_to_upsert, batch_size=100):
     """Async upserts a list of vectors to Pinecone in batches using threads."""
@@ -159,7 +191,7 @@ async def upsert_vectors_to_pinecone_async(index, vectors_to_upsert, batch_size=
     for i in range(0, len(vectors_to_upsert), batch_size):
         batch = vectors_to_upsert[i:i+batch_size]
         # Revert to asyncio.to_thread for synchronous Pinecone client calls
-        tasks.append(asyncio.to_thread(index.upsert, vectors=batch, namespace=NAMESPACE))
+        tasks.append(asyncio.to_thread(upsert_batch_with_retry, index, batch))
     await asyncio.gather(*tasks)
 
 async def prepare_chunk_data_async(md_file: str, full_text: str, idx: int, chunk_text: str):
@@ -177,6 +209,28 @@ async def prepare_chunk_data_async(md_file: str, full_text: str, idx: int, chunk
     }
     return summary, text_for_embedding, base_metadata, f"{md_file}_chunk_{idx}"
 
+async def upsert_batch_logged_async(md_file: str, batch_start: int, vectors: list) -> int:
+    """Upserts one micro-batch of vectors, logging failures; returns the number upserted."""
+    logger.debug(
+        "Upserting %d vectors for %s (chunks %d–%d)",
+        len(vectors),
+        md_file,
+        batch_start,
+        batch_start + len(vectors) - 1,
+    )
+    try:
+        await upsert_vectors_to_pinecone_async(index, vectors)
+        return len(vectors)
+    except Exception as e:
+        logger.error(
+            "Upsert failed for %s batch %d–%d: %s",
+            md_file,
+            batch_start,
+            batch_start + len(vectors) - 1,
+            e,
+        )
+        return 0
+
 async def process_file(md_file: str):
     """Read, chunk, summarize, embed and upsert in micro-batches; write checkpoint on success."""
     checkpoint_path = os.path.join(CHECKPOINT_DIR, f"{md_file}.done")
@@ -199,82 +253,92 @@ async def process_file(md_file: str):
         return
 
     logger.info("Processing %s: %d chunks", md_file, len(chunks))
+    started = time.monotonic()
+    vectors_upserted = 0
+    # Upsert of the previous batch, left running while the next one is
+    # summarized and embedded (at most one in flight per file)
+    pending_upsert = None
 
-    # Process in micro-batches to limit memory and isolate failures
-    for batch_start in range(0, len(chunks), CHUNK_BATCH_SIZE):
-        batch = chunks[batch_start : batch_start + CHUNK_BATCH_SIZE]
-
-        # 1) Summarize each chunk in the batch (isolate failures)
-        tasks = [
-            prepare_chunk_data_async(md_file, full_text, batch_start + idx, ch)
-            for idx, ch in enumerate(batch)
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Filter successful results
-        good = []
-        for idx, res in enumerate(results):
-            if isinstance(res, Exception):
-                logger.error(
-                    "Chunk %d of %s failed to summarize: %s",
-                    batch_start + idx,
+    try:
+        # Process in micro-batches to limit memory and isolate failures
+        for batch_start in range(0, len(chunks), CHUNK_BATCH_SIZE):
+            batch = chunks[batch_start : batch_start + CHUNK_BATCH_SIZE]
+
+            # 1) Summarize each chunk in the batch (isolate failures)
+            tasks = [
+                prepare_chunk_data_async(md_file, full_text, batch_start + idx, ch)
+                for idx, ch in enumerate(batch)
+            ]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+            # Filter successful results
+            good = []
+            for idx, res in enumerate(results):
+                if isinstance(res, Exception):
+                    logger.error(
+                        "Chunk %d of %s failed to summarize: %s",
+                        batch_start + idx,
+                        md_file,
+                        res,
+                    )
+                else:
+                    good.append(res)
+
+            if not good:
+                logger.warning(
+                    "All chunks failed in batch %d–%d for %s; skipping batch",
+                    batch_start,
+                    batch_start + len(batch) - 1,
                     md_file,
-                    res,
                 )
-            else:
-                good.append(res)
-
-        if not good:
-            logger.warning(
-                "All chunks failed in batch %d–%d for %s; skipping batch",
-                batch_start,
-                batch_start + len(batch) - 1,
-                md_file,
-            )
-            continue
-
-        # 2) Batch-embed this chunk batch
-        texts = [item[1] for item in good]
-        try:
-            embeddings = await get_batched_embeddings_with_retry_async(texts)
-        except Exception as e:
-            logger.error(
-                "Embedding batch %d–%d for %s failed: %s",
-                batch_start,
-                batch_start + len(batch) - 1,
-                md_file,
-                e,
-            )
-            continue
-
-        # 3) Build and upsert vectors immediately
-        vectors = []
-        for (summary, _, base_meta, chunk_id), embed in zip(good, embeddings):
-            meta = {**base_meta, "contextual_summary": summary}
-            vectors.append({"id": chunk_id, "values": embed, "metadata": meta})
-
-        if vectors:
-            logger.info(
-                "Upserting %d vectors for %s (chunks %d–%d)",
-                len(vectors),
-                md_file,
-                batch_start,
-                batch_start + len(vectors) - 1,
-            )
+                continue
+
+            # 2) Batch-embed this chunk batch
+            texts = [item[1] for item in good]
             try:
-                await upsert_vectors_to_pinecone_async(index, vectors)
+                embeddings = await get_batched_embeddings_with_retry_async(texts)
             except Exception as e:
                 logger.error(
-                    "Upsert failed for %s batch %d–%d: %s",
-                    md_file,
+                    "Embedding batch %d–%d for %s failed: %s",
                     batch_start,
-                    batch_start + len(vectors) - 1,
+                    batch_start + len(batch) - 1,
+                    md_file,
                     e,
                 )
+                continue
+
+            # 3) Build vectors and upsert them in the background
+            vectors = []
+            for (summary, _, base_meta, chunk_id), embed in zip(good, embeddings):
+                meta = {**base_meta, "contextual_summary": summary}
+                vectors.append({"id": chunk_id, "values": embed, "metadata": meta})
+
+            if vectors:
+                if pending_upsert is not None:
+                    vectors_upserted += await pending_upsert
+                pending_upsert = asyncio.create_task(
+                    upsert_batch_logged_async(md_file, batch_start, vectors)
+                )
+
+        if pending_upsert is not None:
+            vectors_upserted += await pending_upsert
+            pending_upsert = None
+    finally:
+        # Only reached with a task still pending if the loop raised or was
+        # cancelled; don't leave the upsert running detached
+        if pending_upsert is not None:
+            pending_upsert.cancel()
+            await asyncio.gather(pending_upsert, return_exceptions=True)
 
     # Mark file as done for checkpointing
     open(checkpoint_path, "w").close()
-    logger.info("Completed processing %s", md_file)
+    logger.info(
+        "Completed processing %s: %d/%d vectors upserted in %.1fs",
+        md_file,
+        vectors_upserted,
+        len(chunks),
+        time.monotonic() - started,
+    )
 
 async def main():
     md_files = [f for f in os.listdir(MD_DIR) if f.lower().endswith(".md")]